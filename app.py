@@ -5,6 +5,14 @@ import openpyxl
 from openpyxl.styles import PatternFill, Font
 import json
 import io
+import os
+import math
+import re
+import base64
+import hashlib
+import sqlite3
+from contextlib import closing
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # ========== PAGE CONFIG ==========
@@ -211,6 +219,39 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# ========== RASTER FALLBACK SETTINGS ==========
+# Used when a sheet has no selectable text (outlined CAD text or scans)
+RASTER_DPI = 150              # Keeps 2.5mm CAD lettering legible
+RASTER_MAX_TILES = 12         # DPI is lowered on huge sheets to stay under this
+RASTER_TILE_PX = 1568         # Longest tile edge Claude accepts without downscaling
+RASTER_TILE_OVERLAP_PT = 72  # Shared with neighbours; wider than a typical room label block
+RASTER_MARGIN = 0.03          # Sheet border trimmed on every side
+RASTER_TITLE_BLOCK = 0.20     # Right strip (landscape) or bottom strip (portrait), read for the level
+RASTER_TITLE_CORNER = 0.35    # End of that strip skipped when tiling (bottom-right title block corner)
+RASTER_SCAN_COVERAGE = 0.6    # An image covering this much of the sheet is treated as a scan
+RASTER_WORKERS = 4            # Concurrent tile requests per sheet
+
+# ========== ROOM STORE SETTINGS ==========
+def get_room_store_path():
+    """ROOM_STORE_PATH from the environment or secrets, else next to app.py."""
+    path = os.environ.get("ROOM_STORE_PATH")
+    if not path:
+        try:
+            path = st.secrets.get("ROOM_STORE_PATH")
+        except FileNotFoundError:  # No secrets file at all
+            path = None
+    return path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "room_store.db")
+
+ROOM_STORE_PATH = get_room_store_path()
+
+FLOOR_ORDER = {
+    "Basement": 0, "Lower Ground Floor": 1, "Ground Floor": 2,
+    "First Floor": 3, "Second Floor": 4, "Third Floor": 5,
+    "Fourth Floor": 6, "Fifth Floor": 7, "Sixth Floor": 8,
+    "Seventh Floor": 9, "Eighth Floor": 10, "Ninth Floor": 11,
+    "Tenth Floor": 12, "Unknown": 999
+}
+
 # ========== CORE FUNCTIONS ==========
 
 def extract_text_with_coordinates(pdf_bytes):
@@ -385,25 +426,275 @@ If a field is unclear or not present in the text group, use null."""
         st.code(traceback.format_exc())
         return []
 
+def page_hash(pdf_bytes, page_number=0):
+    """Stable cache key for one page of a PDF."""
+    return hashlib.sha256(pdf_bytes + str(page_number).encode()).hexdigest()
+
+def split_sheet_regions(page_rect):
+    """Split a sheet into the drawing area, the title block strip and its corner.
+
+    The whole sheet inside the margins is tiled except the title block corner,
+    so rooms drawn beside a corner title block are still read. The full strip is
+    rendered separately to find the floor level.
+    """
+    margin = RASTER_MARGIN * min(page_rect.width, page_rect.height)
+    drawing_area = fitz.Rect(page_rect.x0 + margin, page_rect.y0 + margin,
+                             page_rect.x1 - margin, page_rect.y1 - margin)
+
+    if drawing_area.width >= drawing_area.height:
+        split_x = drawing_area.x1 - drawing_area.width * RASTER_TITLE_BLOCK
+        title_strip = fitz.Rect(split_x, drawing_area.y0, drawing_area.x1, drawing_area.y1)
+        corner_y = drawing_area.y1 - drawing_area.height * RASTER_TITLE_CORNER
+        title_corner = fitz.Rect(split_x, corner_y, drawing_area.x1, drawing_area.y1)
+    else:
+        split_y = drawing_area.y1 - drawing_area.height * RASTER_TITLE_BLOCK
+        title_strip = fitz.Rect(drawing_area.x0, split_y, drawing_area.x1, drawing_area.y1)
+        corner_x = drawing_area.x1 - drawing_area.width * RASTER_TITLE_CORNER
+        title_corner = fitz.Rect(corner_x, split_y, drawing_area.x1, drawing_area.y1)
+
+    return drawing_area, title_strip, title_corner
+
+def choose_render_dpi(page, area):
+    """Pick the lowest DPI that still reads the sheet, capped by tile budget."""
+    dpi = RASTER_DPI
+
+    # Scans gain nothing from rendering above their native resolution. Only an
+    # image covering most of the sheet counts - a title block logo must not.
+    for image in page.get_image_info():
+        bbox = fitz.Rect(image["bbox"])
+        if bbox.is_empty or abs(bbox & area) < RASTER_SCAN_COVERAGE * abs(area):
+            continue
+        a, b = image["transform"][:2]
+        width_px, height_px = image["width"], image["height"]
+        if abs(b) > abs(a):  # Rotated 90/270 degrees on the page
+            width_px, height_px = height_px, width_px
+        native_dpi = min(width_px / (bbox.width / 72), height_px / (bbox.height / 72))
+        dpi = min(dpi, max(72, native_dpi))
+
+    # Very large sheets: drop resolution rather than send dozens of tiles
+    dpi = int(dpi)
+    while dpi > 72 and len(tile_rects(area, dpi)) > RASTER_MAX_TILES:
+        dpi -= 6
+    return dpi
+
+def tile_rects(area, dpi):
+    """Cover an area with tiles no larger than RASTER_TILE_PX that overlap by
+    RASTER_TILE_OVERLAP_PT, so any label up to that size is whole in one tile."""
+    max_tile_pt = RASTER_TILE_PX / dpi * 72
+    overlap = min(RASTER_TILE_OVERLAP_PT, max_tile_pt / 2)
+    cols = max(1, math.ceil((area.width - overlap) / (max_tile_pt - overlap)))
+    rows = max(1, math.ceil((area.height - overlap) / (max_tile_pt - overlap)))
+
+    # Equal tiles sized so neighbours share exactly the overlap
+    tile_w = (area.width + (cols - 1) * overlap) / cols
+    tile_h = (area.height + (rows - 1) * overlap) / rows
+
+    rects = []
+    for row in range(rows):
+        for col in range(cols):
+            x0 = area.x0 + col * (tile_w - overlap)
+            y0 = area.y0 + row * (tile_h - overlap)
+            rects.append(fitz.Rect(x0, y0, x0 + tile_w, y0 + tile_h))
+    return rects
+
+@st.cache_data(max_entries=4, ttl=600, show_spinner=False)
+def render_drawing_tiles(page_key, _pdf_bytes):
+    """Render the drawing area as PNG tiles and the title block as one image.
+
+    Cached by page hash for a few recent sheets only, so a re-run of the same
+    sheet skips rendering without tiles piling up in the shared server.
+    """
+    doc = fitz.open(stream=_pdf_bytes, filetype="pdf")
+    page = doc[0]  # First page
+
+    drawing_area, title_block, title_corner = split_sheet_regions(page.rect)
+    dpi = choose_render_dpi(page, drawing_area)
+
+    tiles = []
+    for rect in tile_rects(drawing_area, dpi):
+        if title_corner.contains(rect):
+            continue
+        pix = page.get_pixmap(dpi=dpi, clip=rect, colorspace=fitz.csGRAY)
+        # Blank out the part of the title block corner this tile overlaps
+        corner = rect & title_corner
+        if not corner.is_empty:
+            zoom = dpi / 72
+            pix.set_rect(fitz.IRect(
+                pix.x + int((corner.x0 - rect.x0) * zoom), pix.y + int((corner.y0 - rect.y0) * zoom),
+                pix.x + math.ceil((corner.x1 - rect.x0) * zoom), pix.y + math.ceil((corner.y1 - rect.y0) * zoom)
+            ), (255,))
+        tiles.append({
+            "png": pix.tobytes("png"),
+            "x": rect.x0, "y": rect.y0,
+            "width": rect.width, "height": rect.height
+        })
+        pix = None  # Release pixel buffer before rendering the next tile
+
+    title_dpi = int(min(dpi, RASTER_TILE_PX / (max(title_block.width, title_block.height) / 72)))
+    title_png = page.get_pixmap(dpi=title_dpi, clip=title_block, colorspace=fitz.csGRAY).tobytes("png")
+
+    doc.close()
+    return tiles, title_png
+
+def image_block(png_bytes):
+    return {
+        "type": "image",
+        "source": {
+            "type": "base64",
+            "media_type": "image/png",
+            "data": base64.b64encode(png_bytes).decode("ascii")
+        }
+    }
+
+def extract_floor_level_from_image(title_png, client):
+    """Use Claude to read the floor level from a rendered title block."""
+    prompt = """This image is the title block of an architectural floor plan.
+
+Find the floor level from the drawing title or sheet name, e.g.:
+- "Ground Floor Plan" → return "Ground Floor"
+- "First Floor Plan" → return "First Floor"
+- "Basement Plan" → return "Basement"
+- "Level 01" or "L01" → return "First Floor"
+
+Return ONLY one of these exact formats: "Basement", "Ground Floor", "First Floor",
+"Second Floor", "Third Floor", "Fourth Floor", "Fifth Floor" (etc.)
+If you cannot find ANY floor indicator, return "Unknown"
+
+Do not explain, just return the floor level name."""
+
+    try:
+        message = client.messages.create(
+            model="claude-sonnet-4-5-20250929",
+            max_tokens=50,
+            messages=[{"role": "user", "content": [image_block(title_png), {"type": "text", "text": prompt}]}]
+        )
+
+        floor_level = message.content[0].text.strip()
+        floor_level = floor_level.replace('"', '').replace("'", "").strip()
+
+        return floor_level if floor_level else "Unknown"
+    except Exception as e:
+        st.warning(f"Could not extract floor level: {str(e)}")
+        return "Unknown"
+
+def group_tile_with_claude(tile, client):
+    """Use Claude to read room labels from one rendered tile.
+
+    Runs in a worker thread, so errors are raised rather than shown with st.*
+    """
+    prompt = """This image is one tile of an architectural floor plan. Read the room labels in it.
+
+Each room typically has 2-3 text labels near each other (room name, space type, area).
+
+STRICT RULES:
+1. Only report text you can actually read in the image - never guess or invent labels
+2. Identify which text is:
+   - room_name: specific room identifier (e.g., "Classroom 05", "Store", "Pupil WC")
+   - room_number: if there's a separate number/code (e.g., "05", "101", "A-23")
+   - space_type: category/function (e.g., "Teaching Space", "Circulation", "Hygiene Area")
+   - area: size with m² (e.g., "56 m²", "13 m²")
+3. Ignore legends, dimensions, grid references, scale bars and other non-room labels
+4. If a room's labels are cut off by the image edge, still report what is visible and set "partial": true
+5. x and y give the centre of the room name label as a fraction (0-1) of image width and height
+
+Return ONLY valid JSON array:
+[
+  {
+    "room_name": "Classroom 05",
+    "room_number": "05",
+    "space_type": "Teaching Space",
+    "area": "56 m²",
+    "x": 0.42,
+    "y": 0.17,
+    "partial": false
+  }
+]
+
+If a field is unclear or not present, use null. If there are no rooms, return []."""
+
+    message = client.messages.create(
+        model="claude-sonnet-4-5-20250929",
+        max_tokens=4096,
+        messages=[{"role": "user", "content": [image_block(tile["png"]), {"type": "text", "text": prompt}]}]
+    )
+
+    response_text = message.content[0].text
+    start_idx = response_text.find('[')
+    end_idx = response_text.rfind(']') + 1
+    rooms_data = json.loads(response_text[start_idx:end_idx])
+
+    # Convert label positions from tile fractions to page coordinates
+    for room in rooms_data:
+        if room.get("x") is None or room.get("y") is None:
+            room["x"] = room["y"] = None  # Position unknown, can't be matched across tiles
+            continue
+        room["x"] = tile["x"] + float(room["x"]) * tile["width"]
+        room["y"] = tile["y"] + float(room["y"]) * tile["height"]
+    return rooms_data
+
+def group_tiles_with_claude(tiles, client):
+    """Read all tiles in parallel and merge rooms seen twice in the overlaps."""
+    with ThreadPoolExecutor(max_workers=RASTER_WORKERS) as executor:
+        futures = [executor.submit(group_tile_with_claude, tile, client) for tile in tiles]
+
+    rooms, errors = [], []
+    for idx, future in enumerate(futures):
+        try:
+            rooms.extend(future.result())
+        except Exception as e:
+            errors.append(f"tile {idx + 1}/{len(tiles)}: {str(e)}")
+
+    # A label inside an overlap band is reported by both tiles
+    tolerance = RASTER_TILE_OVERLAP_PT
+    rooms = [room for room in rooms if room.get("room_name")]
+    complete = [room for room in rooms if not room.get("partial")]
+    partial = [room for room in rooms if room.get("partial")]
+
+    def room_key(room):
+        # Tiles may read the same label with different spacing or punctuation
+        return " ".join(re.sub(r"[^a-z0-9]+", " ", str(room["room_name"]).lower()).split())
+
+    def near(room, other):
+        if room["x"] is None or other["x"] is None:
+            return False
+        return abs(room["x"] - other["x"]) <= tolerance and abs(room["y"] - other["y"]) <= tolerance
+
+    merged = []
+    for room in complete:
+        if not any(room_key(room) == room_key(other) and near(room, other) for other in merged):
+            merged.append(room)
+
+    # A cut-off label is normally whole in the neighbouring tile; keep it only if not
+    kept_partial = 0
+    for room in partial:
+        if not any(near(room, other) for other in merged):
+            merged.append(room)
+            kept_partial += 1
+    if kept_partial:
+        errors.append(f"{kept_partial} room label(s) were cut by tile edges and may be incomplete")
+
+    unpositioned = sum(1 for room in merged if room["x"] is None)
+    if unpositioned:
+        errors.append(f"{unpositioned} room(s) came back without a position and could not be "
+                      "checked for duplicates across tiles")
+
+    for room in merged:
+        room.pop("x", None)
+        room.pop("y", None)
+        room.pop("partial", None)
+    return merged, errors
+
 def sort_rooms(rooms_data):
     """Sort rooms by floor level and then alphabetically by room name."""
-    floor_order = {
-        "Basement": 0, "Lower Ground Floor": 1, "Ground Floor": 2,
-        "First Floor": 3, "Second Floor": 4, "Third Floor": 5,
-        "Fourth Floor": 6, "Fifth Floor": 7, "Sixth Floor": 8,
-        "Seventh Floor": 9, "Eighth Floor": 10, "Ninth Floor": 11,
-        "Tenth Floor": 12, "Unknown": 999
-    }
-    
     def sort_key(room):
         level = room.get("level", "Unknown")
         room_name = room.get("room_name", "")
-        floor_num = floor_order.get(level, 999)
+        floor_num = FLOOR_ORDER.get(level, 999)
         return (floor_num, room_name.lower())
     
     return sorted(rooms_data, key=sort_key)
 
-def create_excel(rooms_data):
+def create_excel(rooms_data, project_name=None):
     """Create Excel file with ventilation template format."""
     wb = openpyxl.Workbook()
     ws = wb.active
@@ -413,6 +704,8 @@ def create_excel(rooms_data):
     ws['A1'] = 'Calculation:'
     ws['B1'] = 'Ventilation'
     ws['A2'] = 'Project Name:'
+    if project_name:
+        ws['B2'] = project_name
     ws['A3'] = 'Project Number:'
     ws['A4'] = 'Revision:'
     ws['A5'] = 'Date:'
@@ -490,6 +783,133 @@ def create_excel(rooms_data):
     output.seek(0)
     return output
 
+# ========== ROOM STORE ==========
+
+@st.cache_resource
+def init_room_store(path=ROOM_STORE_PATH):
+    """Create the store's tables and indexes once per server process."""
+    with closing(sqlite3.connect(path, timeout=30)) as conn:
+        conn.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS rooms (
+                id INTEGER PRIMARY KEY,
+                project TEXT NOT NULL,
+                level TEXT NOT NULL,
+                room_name TEXT NOT NULL,
+                room_number TEXT,
+                space_type TEXT,
+                area TEXT,
+                sheet TEXT NOT NULL,
+                sheet_hash TEXT NOT NULL,
+                extracted_at TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS project_revisions (
+                project TEXT PRIMARY KEY,
+                revision INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_rooms_project_level ON rooms (project, level);
+            CREATE INDEX IF NOT EXISTS idx_rooms_project_name ON rooms (project, room_name COLLATE NOCASE);
+            CREATE INDEX IF NOT EXISTS idx_rooms_project_sheet ON rooms (project, sheet, level);
+            CREATE INDEX IF NOT EXISTS idx_rooms_project_sheet_hash ON rooms (project, sheet_hash);
+        """)
+    return path
+
+def open_room_store(path=ROOM_STORE_PATH):
+    """Open a connection to the project room store."""
+    conn = sqlite3.connect(init_room_store(path), timeout=30)
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def bump_revision(conn, project):
+    """Record a change to a project so cached exports are rebuilt."""
+    conn.execute(
+        "INSERT INTO project_revisions (project, revision) VALUES (?, 1) "
+        "ON CONFLICT (project) DO UPDATE SET revision = revision + 1",
+        (project,)
+    )
+
+def save_rooms(project, sheet, sheet_hash, level, rooms):
+    """Store the rooms from one sheet, replacing earlier runs of the same sheet.
+
+    A sheet is the same drawing (matching content hash, even if renamed) or
+    the same file name at the same level (a revised drawing). Returns the
+    names of the sheets that were replaced.
+    """
+    extracted_at = datetime.now().isoformat(timespec="seconds")
+    rows = [
+        (project, level, room.get("room_name") or "", room.get("room_number"),
+         room.get("space_type"), room.get("area"), sheet, sheet_hash, extracted_at)
+        for room in rooms
+    ]
+    match = "project = ? AND (sheet_hash = ? OR (sheet = ? AND level = ?))"
+    match_params = (project, sheet_hash, sheet, level)
+
+    with closing(open_room_store()) as conn, conn:
+        replaced = [row["sheet"] for row in conn.execute(
+            f"SELECT DISTINCT sheet FROM rooms WHERE {match} ORDER BY sheet", match_params
+        )]
+        conn.execute(f"DELETE FROM rooms WHERE {match}", match_params)
+        conn.executemany(
+            "INSERT INTO rooms (project, level, room_name, room_number, space_type, area, sheet, sheet_hash, extracted_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows
+        )
+        bump_revision(conn, project)
+    return replaced
+
+def list_projects():
+    """Return stored project names, most recently updated first."""
+    with closing(open_room_store()) as conn:
+        rows = conn.execute(
+            "SELECT project FROM rooms GROUP BY project ORDER BY MAX(extracted_at) DESC"
+        ).fetchall()
+    return [row["project"] for row in rows]
+
+def list_sheets(project):
+    """Return one summary row per stored sheet of a project."""
+    with closing(open_room_store()) as conn:
+        rows = conn.execute(
+            "SELECT sheet, sheet_hash, level, COUNT(*) AS rooms, MAX(extracted_at) AS extracted_at "
+            "FROM rooms WHERE project = ? GROUP BY sheet, sheet_hash, level ORDER BY sheet, level",
+            (project,)
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+def load_rooms(project, levels=None, name_filter=None):
+    """Load a project's stored rooms, optionally filtered by level and room name."""
+    query = "SELECT level, room_name, room_number, space_type, area, sheet FROM rooms WHERE project = ?"
+    params = [project]
+    if levels:
+        query += f" AND level IN ({', '.join('?' * len(levels))})"
+        params.extend(levels)
+    if name_filter:
+        escaped = name_filter.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        query += " AND room_name LIKE ? ESCAPE '\\'"
+        params.append(f"%{escaped}%")
+
+    with closing(open_room_store()) as conn:
+        return [dict(row) for row in conn.execute(query, params)]
+
+def store_revision(project):
+    """Counter bumped by every save and delete, used to invalidate cached exports."""
+    with closing(open_room_store()) as conn:
+        row = conn.execute("SELECT revision FROM project_revisions WHERE project = ?", (project,)).fetchone()
+    return row["revision"] if row else 0
+
+def delete_sheet(project, sheet, sheet_hash, level):
+    """Remove one stored sheet's rooms from a project."""
+    with closing(open_room_store()) as conn, conn:
+        conn.execute(
+            "DELETE FROM rooms WHERE project = ? AND sheet = ? AND sheet_hash = ? AND level = ?",
+            (project, sheet, sheet_hash, level)
+        )
+        bump_revision(conn, project)
+
+@st.cache_data(max_entries=20, show_spinner=False)
+def load_project_view(project, levels, name_filter, revision):
+    """Load and sort a project view, cached per filter and store revision."""
+    return sort_rooms(load_rooms(project, levels, name_filter))
+
 # ========== STREAMLIT APP ==========
 
 def main():
@@ -565,6 +985,13 @@ def main():
     </div>
     """, unsafe_allow_html=True)
     
+    project_name = st.text_input(
+        "Project",
+        placeholder="e.g. 2417 - Oakfield Primary School",
+        help="Rooms are saved under this project so floors processed on different days can be exported together",
+        key="project_name"
+    ).strip()
+    
     uploaded_files = st.file_uploader(
         "Choose PDF files",
         type=['pdf'],
@@ -611,6 +1038,7 @@ def main():
             try:
                 client = anthropic.Anthropic(api_key=api_key)
                 all_rooms = []
+                saved_sheets = 0
                 
                 # Prepare files for processing
                 files_to_process = []
@@ -638,22 +1066,50 @@ def main():
                         text_items = extract_text_with_coordinates(pdf_bytes)
                         
                         if len(text_items) == 0:
-                            st.warning(f"⚠️ No text found in {file_data['name']}")
-                            continue
+                            # Outlined text or a scan - read the drawing as images instead
+                            st.info(f"ℹ️ No selectable text in {file_data['name']}, reading the drawing as images. "
+                                    "Rooms inside the bottom-right title block corner are not read.")
+                            progress_bar.progress(file_progress * 0.4, text=f"Rendering drawing area of {file_data['name']}...")
+                            tiles, title_png = render_drawing_tiles(page_hash(pdf_bytes), pdf_bytes)
+                            
+                            progress_bar.progress(file_progress * 0.5, text=f"Identifying floor level in {file_data['name']}...")
+                            floor_level = extract_floor_level_from_image(title_png, client)
+                            
+                            progress_bar.progress(file_progress * 0.8, text=f"Reading room labels from {len(tiles)} tile(s) of {file_data['name']}...")
+                            rooms, tile_errors = group_tiles_with_claude(tiles, client)
+                            for tile_error in tile_errors:
+                                st.warning(f"⚠️ {file_data['name']}: {tile_error}")
+                            
+                        else:
+                            # Get floor level
+                            progress_bar.progress(file_progress * 0.5, text=f"Identifying floor level in {file_data['name']}...")
+                            floor_level = extract_floor_level(text_items, client)
+                            
+                            # Group rooms
+                            progress_bar.progress(file_progress * 0.8, text=f"Grouping room data in {file_data['name']}...")
+                            rooms = group_text_with_claude(text_items, client)
                         
-                        # Get floor level
-                        progress_bar.progress(file_progress * 0.5, text=f"Identifying floor level in {file_data['name']}...")
-                        floor_level = extract_floor_level(text_items, client)
-                        
-                        # Group rooms
-                        progress_bar.progress(file_progress * 0.8, text=f"Grouping room data in {file_data['name']}...")
-                        rooms = group_text_with_claude(text_items, client)
+                        # An empty result is usually an API or parsing error, so it
+                        # must never replace rooms stored by an earlier run
+                        if len(rooms) == 0:
+                            if project_name:
+                                st.warning(f"⚠️ No rooms found in {file_data['name']}, nothing was saved to {project_name}")
+                            else:
+                                st.warning(f"⚠️ No rooms found in {file_data['name']}")
+                            continue
                         
                         # Add floor level
                         for room in rooms:
                             room["level"] = floor_level
                         
                         all_rooms.extend(rooms)
+                        
+                        # Keep this sheet's rooms for building-wide exports
+                        if project_name:
+                            replaced = save_rooms(project_name, file_data['name'], page_hash(pdf_bytes), floor_level, rooms)
+                            saved_sheets += 1
+                            if replaced:
+                                st.info(f"♻️ Replaced stored rooms from {', '.join(replaced)} in {project_name}")
                         progress_bar.progress(file_progress, text=f"Completed {file_data['name']}")
                         
                     except Exception as file_error:
@@ -667,6 +1123,10 @@ def main():
                 
                 # Create Excel
                 st.success(f"✅ Successfully extracted {len(all_rooms)} rooms from {len(files_to_process)} file(s)!")
+                if saved_sheets > 0:
+                    st.info(f"💾 Saved {saved_sheets} sheet(s) to project **{project_name}** - export all its floors from Project Schedule below")
+                elif not project_name:
+                    st.info("💡 Enter a project name before extracting to keep these rooms for a building-wide export")
                 
                 # Show preview
                 st.markdown("### 📋 Preview")
@@ -684,7 +1144,7 @@ def main():
                     st.info(f"Showing 10 of {len(all_rooms)} rooms")
                 
                 # Download button
-                excel_file = create_excel(all_rooms)
+                excel_file = create_excel(all_rooms, project_name)
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 
                 st.download_button(
@@ -705,6 +1165,66 @@ def main():
     elif uploaded_files and not api_key:
         st.warning("⚠️ Please enter your Claude API key in the Configuration section above")
     
+    # Project schedule - combine floors stored by earlier runs without re-extracting
+    projects = list_projects()
+    if projects:
+        st.markdown("### 🗂️ Project Schedule")
+        
+        selected_project = st.selectbox(
+            "Stored project",
+            projects,
+            index=projects.index(project_name) if project_name in projects else 0,
+            key="schedule_project"
+        )
+        sheets = list_sheets(selected_project)
+        levels = sorted({sheet["level"] for sheet in sheets}, key=lambda level: FLOOR_ORDER.get(level, 999))
+        
+        filter_col1, filter_col2 = st.columns(2)
+        with filter_col1:
+            selected_levels = st.multiselect("Levels", levels, placeholder="All levels", key="schedule_levels")
+        with filter_col2:
+            name_filter = st.text_input("Room name contains", key="schedule_filter").strip()
+        
+        with st.expander(f"📋 {len(sheets)} stored sheet(s)"):
+            for sheet in sheets:
+                sheet_col, remove_col = st.columns([5, 1])
+                sheet_col.write(f"• {sheet['sheet']} - {sheet['level']}, {sheet['rooms']} rooms ({sheet['extracted_at'].replace('T', ' ')})")
+                if remove_col.button("Remove", key=f"remove_{sheet['sheet']}_{sheet['sheet_hash']}_{sheet['level']}"):
+                    delete_sheet(selected_project, sheet['sheet'], sheet['sheet_hash'], sheet['level'])
+                    st.rerun()
+        
+        revision = store_revision(selected_project)
+        project_rooms = load_project_view(selected_project, tuple(selected_levels), name_filter, revision)
+        st.dataframe([
+            {
+                "Level": room["level"],
+                "Room Name": room["room_name"],
+                "Room Number": room["room_number"],
+                "Room Type": room["space_type"],
+                "Area": room["area"],
+                "Sheet": room["sheet"]
+            }
+            for room in project_rooms
+        ], use_container_width=True)
+        
+        # Building the workbook is the slow part, so only do it when asked
+        export_key = (selected_project, tuple(selected_levels), name_filter, revision)
+        if st.button(f"📦 Prepare Project Excel ({len(project_rooms)} rooms)", key="prepare_export"):
+            st.session_state.project_export = (export_key, create_excel(project_rooms, selected_project).getvalue())
+        
+        project_export = st.session_state.get("project_export")
+        if project_export and project_export[0] == export_key:
+            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            safe_project = "".join(c if c.isalnum() or c in "-_" else "_" for c in selected_project)
+            st.download_button(
+                label=f"📥 Download Project Excel ({len(project_rooms)} rooms)",
+                data=project_export[1],
+                file_name=f"{safe_project}_room_data_{timestamp}.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                use_container_width=True,
+                key="project_download"
+            )
+    
     # Footer
     st.markdown("""
     <div class="footer">
@@ -0,0 +1,452 @@
+"""Multi-session load test for the Rybka Room Data Extractor.
+
+Starts the real app with ``streamlit run`` (headless) against a local fake
+Claude endpoint, then drives N simulated browser sessions concurrently through
+the upload -> extract -> download flow over Streamlit's websocket protocol.
+For each concurrency level it reports throughput, latency percentiles and the
+server's memory use, so the shared instance can be sized before it stalls.
+
+Usage:
+    python loadtest.py --concurrency 1,2,4,8 --iterations 3 --latency 2.0
+    python loadtest.py --pdf plans/ground_floor.pdf --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fitz  # PyMuPDF
+from tornado.httpclient import AsyncHTTPClient, HTTPRequest
+from tornado.websocket import websocket_connect
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(APP_DIR, "app.py")
+
+# ========== FAKE CLAUDE ENDPOINT ==========
+
+def sample_rooms(count):
+    """Room records matching the labels drawn by make_sample_pdf."""
+    return [
+        {
+            "room_name": f"Classroom {i + 1:02d}",
+            "room_number": f"{i + 1:02d}",
+            "space_type": "Teaching Space",
+            "area": f"{40 + i} m²",
+        }
+        for i in range(count)
+    ]
+
+def start_fake_llm(latency, jitter, rooms):
+    """Serve a minimal Anthropic Messages API on a free local port."""
+    rooms_json = json.dumps(sample_rooms(rooms), ensure_ascii=False)
+
+    class FakeClaudeHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            time.sleep(max(0.0, latency + random.uniform(-jitter, jitter)))
+
+            # extract_floor_level asks for a handful of tokens, grouping for thousands
+            text = "Ground Floor" if body.get("max_tokens", 0) <= 50 else rooms_json
+            payload = json.dumps({
+                "id": f"msg_{uuid.uuid4().hex}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model", "fake"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "stop_sequence": None,
+                "usage": {"input_tokens": 0, "output_tokens": 0},
+            }).encode("utf-8")
+
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeClaudeHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def make_sample_pdf(rooms):
+    """Build a one-page floor plan with a title block and room labels."""
+    doc = fitz.open()
+    page = doc.new_page(width=1190, height=842)  # A3 landscape
+    page.insert_text((900, 800), "GROUND FLOOR PLAN", fontsize=14)
+    for i, room in enumerate(sample_rooms(rooms)):
+        x = 60 + (i % 6) * 140
+        y = 80 + (i // 6) * 120
+        page.insert_text((x, y), room["room_name"], fontsize=9)
+        page.insert_text((x, y + 12), room["space_type"], fontsize=7)
+        page.insert_text((x, y + 24), room["area"].replace("²", "2"), fontsize=7)
+    pdf_bytes = doc.tobytes()
+    doc.close()
+    return pdf_bytes
+
+# ========== STREAMLIT SERVER ==========
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def start_app_server(port, llm_url, workdir):
+    """Launch the app headless with its API calls pointed at the fake endpoint."""
+    # Run from a scratch directory so the real secrets file is never read
+    streamlit_dir = os.path.join(workdir, ".streamlit")
+    os.makedirs(streamlit_dir, exist_ok=True)
+    shutil.copy(os.path.join(APP_DIR, ".streamlit", "config.toml"), streamlit_dir)
+    with open(os.path.join(streamlit_dir, "secrets.toml"), "w") as f:
+        f.write('ANTHROPIC_API_KEY = "loadtest"\n')
+
+    # Keep the app's room store in the scratch directory, away from real project data
+    env = dict(os.environ, ANTHROPIC_BASE_URL=llm_url,
+               ROOM_STORE_PATH=os.path.join(workdir, "room_store.db"))
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "streamlit", "run", APP_PATH,
+            "--server.headless", "true",
+            "--server.port", str(port),
+            "--server.address", "127.0.0.1",
+            "--server.enableXsrfProtection", "false",
+            "--server.fileWatcherType", "none",
+        ],
+        cwd=workdir,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+async def wait_for_health(base_url, timeout=60):
+    client = AsyncHTTPClient()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.fetch(f"{base_url}/_stcore/health")
+            return
+        except Exception:
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Streamlit server did not become healthy within {timeout}s")
+
+def rss_mb(pid):
+    """Resident memory of a process in MB, or None where /proc is unavailable."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+# ========== SIMULATED SESSION ==========
+
+class SimulatedSession:
+    """One browser tab talking to the app over the Streamlit websocket."""
+
+    def __init__(self, base_url, pdf_name, pdf_bytes, timeout):
+        self.base_url = base_url
+        self.pdf_name = pdf_name
+        self.pdf_bytes = pdf_bytes
+        self.timeout = timeout
+        self.http = AsyncHTTPClient()
+        self.ws = None
+        self.session_id = None
+        self.msg_cache = {}
+
+    async def connect(self):
+        ws_url = self.base_url.replace("http://", "ws://") + "/_stcore/stream"
+        self.ws = await websocket_connect(ws_url, max_message_size=512 * 1024 * 1024)
+
+    def close(self):
+        if self.ws is not None:
+            self.ws.close()
+
+    async def send(self, back_msg):
+        await self.ws.write_message(back_msg.SerializeToString(), binary=True)
+
+    async def receive(self):
+        payload = await asyncio.wait_for(self.ws.read_message(), self.timeout)
+        if payload is None:
+            raise RuntimeError("Websocket closed by server")
+        msg = ForwardMsg()
+        msg.ParseFromString(payload)
+
+        # The server sends hash references for messages it believes we cached
+        if msg.WhichOneof("type") == "ref_hash":
+            msg = self.msg_cache[msg.ref_hash]
+        elif msg.metadata.cacheable:
+            self.msg_cache[msg.hash] = msg
+        return msg
+
+    async def rerun(self, widgets=()):
+        """Rerun the script and collect the elements it produced."""
+        back_msg = BackMsg()
+        back_msg.rerun_script.widget_states.widgets.extend(widgets)
+        await self.send(back_msg)
+
+        elements = []
+        while True:
+            msg = await self.receive()
+            msg_type = msg.WhichOneof("type")
+            if msg_type == "new_session":
+                self.session_id = msg.new_session.initialize.session_id
+            elif msg_type == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                elements.append(msg.delta.new_element)
+            elif msg_type == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    elements = []
+                    continue
+                return elements
+
+    async def upload(self, uploader_id):
+        """Upload the PDF the way the browser file_uploader does."""
+        back_msg = BackMsg()
+        back_msg.file_urls_request.request_id = uuid.uuid4().hex
+        back_msg.file_urls_request.file_names.append(self.pdf_name)
+        back_msg.file_urls_request.session_id = self.session_id
+        await self.send(back_msg)
+
+        while True:
+            msg = await self.receive()
+            if msg.WhichOneof("type") == "file_urls_response":
+                file_urls = msg.file_urls_response.file_urls[0]
+                break
+
+        boundary = uuid.uuid4().hex
+        body = (
+            f"--{boundary}\r\n"
+            f'Content-Disposition: form-data; name="file"; filename="{self.pdf_name}"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode("utf-8") + self.pdf_bytes + f"\r\n--{boundary}--\r\n".encode("utf-8")
+        await self.http.fetch(HTTPRequest(
+            f"{self.base_url}{file_urls.upload_url}",
+            method="PUT",
+            body=body,
+            headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+            request_timeout=self.timeout,
+        ))
+
+        state = WidgetState(id=uploader_id)
+        info = state.file_uploader_state_value.uploaded_file_info.add()
+        info.file_id = file_urls.file_id
+        info.name = self.pdf_name
+        info.size = len(self.pdf_bytes)
+        info.file_urls.CopyFrom(file_urls)
+        return state
+
+    async def extract(self, uploader_state, button_id):
+        """Click Extract and download the workbook; return (extract_s, download_s)."""
+        started = time.perf_counter()
+        elements = await self.rerun([uploader_state, WidgetState(id=button_id, trigger_value=True)])
+        extracted = time.perf_counter()
+
+        check_errors(elements)
+        download = find_element(elements, "download_button")
+        if download is None:
+            raise RuntimeError("Extraction finished without a download button")
+
+        response = await self.http.fetch(
+            f"{self.base_url}/{download.download_button.url.lstrip('/')}",
+            request_timeout=self.timeout,
+        )
+        if not response.body.startswith(b"PK"):
+            raise RuntimeError("Downloaded file is not an Excel workbook")
+        return extracted - started, time.perf_counter() - extracted
+
+def find_element(elements, element_type):
+    for element in elements:
+        if element.WhichOneof("type") == element_type:
+            return element
+    return None
+
+def check_errors(elements):
+    for element in elements:
+        if element.WhichOneof("type") == "exception":
+            raise RuntimeError(element.exception.message)
+        if element.WhichOneof("type") == "alert" and element.alert.format == element.alert.ERROR:
+            raise RuntimeError(element.alert.body)
+
+async def run_session(base_url, pdf_name, pdf_bytes, iterations, timeout):
+    """Connect, upload once, then extract+download `iterations` times."""
+    session = SimulatedSession(base_url, pdf_name, pdf_bytes, timeout)
+    timings = []
+    try:
+        await session.connect()
+        elements = await session.rerun()
+        uploader = find_element(elements, "file_uploader")
+        uploader_state = await session.upload(uploader.file_uploader.id)
+
+        elements = await session.rerun([uploader_state])
+        check_errors(elements)
+        button = find_element(elements, "button")
+        if button is None:
+            raise RuntimeError("Extract button not shown after upload")
+
+        for _ in range(iterations):
+            extract_s, download_s = await session.extract(uploader_state, button.button.id)
+            timings.append({"extract": extract_s, "download": download_s})
+        return timings, None
+    except Exception as e:
+        return timings, f"{type(e).__name__}: {e}"
+    finally:
+        session.close()
+
+# ========== LOAD LEVELS ==========
+
+def percentile(values, pct):
+    """Nearest-rank percentile."""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_level(base_url, server_pid, concurrency, args, pdf_name, pdf_bytes):
+    """Run `concurrency` sessions at once and summarise the level."""
+    baseline_mb = rss_mb(server_pid)
+    peak_mb = baseline_mb
+    done = asyncio.Event()
+
+    async def sample_memory():
+        nonlocal peak_mb
+        while not done.is_set():
+            current_mb = rss_mb(server_pid)
+            if current_mb is not None:
+                peak_mb = max(peak_mb, current_mb)
+            await asyncio.sleep(0.1)
+
+    sampler = asyncio.ensure_future(sample_memory())
+    started = time.perf_counter()
+    results = await asyncio.gather(*[
+        run_session(base_url, pdf_name, pdf_bytes, args.iterations, args.timeout)
+        for _ in range(concurrency)
+    ])
+    wall_s = time.perf_counter() - started
+    done.set()
+    await sampler
+
+    totals = [t["extract"] + t["download"] for timings, _ in results for t in timings]
+    errors = [error for _, error in results if error]
+    return {
+        "concurrency": concurrency,
+        "completed": len(totals),
+        "errors": len(errors),
+        "error_samples": sorted(set(errors))[:3],
+        "wall_s": wall_s,
+        "throughput_per_min": len(totals) / wall_s * 60 if wall_s else 0.0,
+        "latency_p50_s": percentile(totals, 50),
+        "latency_p95_s": percentile(totals, 95),
+        "latency_p99_s": percentile(totals, 99),
+        "latency_max_s": max(totals) if totals else float("nan"),
+        "download_p95_s": percentile([t["download"] for timings, _ in results for t in timings], 95),
+        "rss_baseline_mb": baseline_mb,
+        "rss_peak_mb": peak_mb,
+        "rss_per_session_mb": (peak_mb - baseline_mb) / concurrency if baseline_mb is not None else None,
+    }
+
+def format_mb(value):
+    return f"{value:>8.1f}" if value is not None else f"{'n/a':>8}"
+
+def print_report(levels, args):
+    print(f"\nFake LLM latency {args.latency:.2f}s ±{args.jitter:.2f}s, "
+          f"{args.iterations} extraction(s) per session\n")
+    header = (f"{'sessions':>8} {'done':>5} {'err':>4} {'extr/min':>9} {'p50 s':>7} "
+              f"{'p95 s':>7} {'p99 s':>7} {'max s':>7} {'peak MB':>8} {'MB/sess':>8}")
+    print(header)
+    print("-" * len(header))
+    for level in levels:
+        print(f"{level['concurrency']:>8} {level['completed']:>5} {level['errors']:>4} "
+              f"{level['throughput_per_min']:>9.1f} {level['latency_p50_s']:>7.2f} "
+              f"{level['latency_p95_s']:>7.2f} {level['latency_p99_s']:>7.2f} "
+              f"{level['latency_max_s']:>7.2f} {format_mb(level['rss_peak_mb'])} "
+              f"{format_mb(level['rss_per_session_mb'])}")
+        for error in level["error_samples"]:
+            print(f"{'':>8} ! {error}")
+
+async def run_load_test(args):
+    if args.pdf:
+        pdf_name = os.path.basename(args.pdf)
+        with open(args.pdf, "rb") as f:
+            pdf_bytes = f.read()
+    else:
+        pdf_name = "loadtest_plan.pdf"
+        pdf_bytes = make_sample_pdf(args.rooms)
+
+    llm = start_fake_llm(args.latency, args.jitter, args.rooms)
+    llm_url = f"http://127.0.0.1:{llm.server_address[1]}"
+    port = args.port or free_port()
+    base_url = f"http://127.0.0.1:{port}"
+
+    with tempfile.TemporaryDirectory(prefix="rybka_loadtest_") as workdir:
+        server = start_app_server(port, llm_url, workdir)
+        try:
+            await wait_for_health(base_url)
+            if rss_mb(server.pid) is None:
+                print("  Memory columns unavailable: /proc is needed to read the server's RSS",
+                      file=sys.stderr)
+            # Warm-up session so imports and first-run costs don't skew level 1
+            _, warmup_error = await run_session(base_url, pdf_name, pdf_bytes, 1, args.timeout)
+            if warmup_error:
+                raise SystemExit(f"Warm-up session failed, not running load levels: {warmup_error}")
+
+            levels = []
+            for concurrency in args.concurrency:
+                level = await run_level(base_url, server.pid, concurrency, args, pdf_name, pdf_bytes)
+                levels.append(level)
+                print(f"  {concurrency} session(s): {level['completed']} done, "
+                      f"{level['errors']} errors in {level['wall_s']:.1f}s", file=sys.stderr)
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+            llm.shutdown()
+
+    print_report(levels, args)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "levels": levels}, f, indent=2)
+    return levels
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load-test the Rybka Room Data Extractor")
+    parser.add_argument("--concurrency", default="1,2,4,8",
+                        type=lambda s: [int(n) for n in s.split(",") if n.strip()],
+                        help="Comma-separated concurrent session counts (default: 1,2,4,8)")
+    parser.add_argument("--iterations", type=int, default=2,
+                        help="Extractions each session runs back to back (default: 2)")
+    parser.add_argument("--latency", type=float, default=1.5,
+                        help="Fake LLM response time in seconds (default: 1.5)")
+    parser.add_argument("--jitter", type=float, default=0.25,
+                        help="Uniform ± jitter on the LLM latency in seconds (default: 0.25)")
+    parser.add_argument("--rooms", type=int, default=24,
+                        help="Rooms in the generated plan and fake response (default: 24)")
+    parser.add_argument("--pdf", help="Use this floor plan PDF instead of a generated one")
+    parser.add_argument("--port", type=int, help="Port for the Streamlit server (default: any free port)")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Per-step timeout in seconds (default: 300)")
+    parser.add_argument("--json", help="Also write results to this JSON file")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    asyncio.run(run_load_test(parse_args()))